@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
@@ -10,6 +9,12 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 import joblib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from prepare_data import CSV_PATH, PARQUET_PATH, build_dataset, parquet_is_current, write_dataset
 
 # Page Configuration
 st.set_page_config(
@@ -44,151 +49,280 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def load_data():
-    """Load and preprocess the retail data"""
+    """Load the prepared retail data, rebuilding it from the CSV if missing or stale"""
     try:
-        df = pd.read_csv('data/superstore_sales.csv')
-        df['Order_Date'] = pd.to_datetime(df['Order_Date'])
-        df['Ship_Date'] = pd.to_datetime(df['Ship_Date'])
+        if parquet_is_current():
+            source = PARQUET_PATH
+            df = pd.read_parquet(PARQUET_PATH, engine='pyarrow')
+        else:
+            source = CSV_PATH
+            df = build_dataset()
+            try:
+                write_dataset(df)
+                source = PARQUET_PATH
+            except OSError:
+                # Read-only checkouts still get the rebuilt frame, just not the file
+                pass
+        
+        # Identifies this build of the data; the view caches are keyed on it
+        df.attrs['data_version'] = (source, os.stat(source).st_mtime_ns)
         
-        # Create additional features
-        df['Order_Month'] = df['Order_Date'].dt.to_period('M')
-        df['Order_Year'] = df['Order_Date'].dt.year
-        df['Order_Quarter'] = df['Order_Date'].dt.quarter
-        df['Processing_Time'] = (df['Ship_Date'] - df['Order_Date']).dt.days
+        # Sidebar options, read from the category index instead of scanning the columns
+        df.attrs['region_options'] = ['All', *df['Region'].cat.categories]
+        df.attrs['category_options'] = ['All', *df['Category'].cat.categories]
         
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
-def main():
-    st.markdown('<h1 class="main-header">🏪 Retail Sales Analytics Dashboard</h1>', unsafe_allow_html=True)
-    st.markdown("### Advanced Business Intelligence & Forecasting Platform")
-    
-    # Load data
-    df = load_data()
-    if df is None:
-        st.stop()
-    
-    # Sidebar
-    st.sidebar.title("🎛️ Dashboard Controls")
+def category_mask(column, value):
+    """Boolean mask for a categorical column, compared on its integer codes"""
+    code = column.cat.categories.get_loc(value)
+    return column.cat.codes.values == code
+
+def apply_filters(df, region, category, start_date, end_date):
+    """Filter the dataset by region, category and order date range"""
+    # df is sorted by Order_Date, so the date range is a contiguous slice
+    order_dates = df['Order_Date'].values
+    lo = np.searchsorted(order_dates, np.datetime64(start_date), side='left')
+    hi = np.searchsorted(order_dates, np.datetime64(end_date), side='right')
     
-    # Date range filter
-    min_date = df['Order_Date'].min()
-    max_date = df['Order_Date'].max()
-    start_date = st.sidebar.date_input("Start Date", min_date)
-    end_date = st.sidebar.date_input("End Date", max_date)
+    date_slice = df.iloc[lo:hi]
     
-    # Region filter
-    regions = ['All'] + list(df['Region'].unique())
-    selected_region = st.sidebar.selectbox("Select Region", regions)
+    # Combine the remaining filters into one mask and index the slice once
+    mask = np.ones(len(date_slice), dtype=bool)
+    if region != 'All':
+        mask &= category_mask(date_slice['Region'], region)
+    if category != 'All':
+        mask &= category_mask(date_slice['Category'], category)
+    return date_slice.iloc[mask]
+
+def shared_filter(df, region, category, start_date, end_date):
+    """Return a loader that filters on first call and shares the frame across threads"""
+    lock = threading.Lock()
+    filtered = []
     
-    # Category filter
-    categories = ['All'] + list(df['Category'].unique())
-    selected_category = st.sidebar.selectbox("Select Category", categories)
+    def load():
+        with lock:
+            if not filtered:
+                filtered.append(apply_filters(df, region, category, start_date, end_date))
+            return filtered[0]
+    return load
+
+def top_n(frame, column, n=10):
+    """Return the n rows with the largest values in column, largest first"""
+    values = frame[column].values
+    if len(values) > n:
+        # Partial selection is O(len), only the n winners get sorted
+        frame = frame.iloc[np.argpartition(values, -n)[-n:]]
+    return frame.sort_values(column, ascending=False)
+
+# The view aggregations below are cached on the data version and filter values.
+# Streamlit skips hashing the leading-underscore loader, which returns the frame
+# those values select; it only runs when a view misses the cache.
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def kpi_agg(_load_filtered, data_version, region, category, start_date, end_date):
+    """Compute the headline KPIs in a single aggregation call"""
+    filtered_df = _load_filtered()
+    kpis = filtered_df.agg({
+        'Sales': ['sum', 'mean'],
+        'Profit': 'sum',
+        'Order_ID': 'nunique'
+    })
+    return {
+        'total_sales': kpis.at['sum', 'Sales'],
+        'total_profit': kpis.at['sum', 'Profit'],
+        'avg_order_value': kpis.at['mean', 'Sales'],
+        'total_orders': int(kpis.at['nunique', 'Order_ID'])
+    }
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def monthly_agg(_load_filtered, data_version, region, category, start_date, end_date):
+    """Aggregate sales, profit and order count per month"""
+    filtered_df = _load_filtered()
+    # Rows are in date order, so unsorted groups already come out by month
+    monthly_sales = filtered_df.groupby('Order_MonthInt', sort=False, observed=True).agg({
+        'Sales': 'sum',
+        'Profit': 'sum',
+        'Order_ID': 'nunique'
+    }).reset_index()
+    # Turn the integer month keys back into timestamps for plotting
+    month_starts = monthly_sales.pop('Order_MonthInt').values.astype('datetime64[M]').astype('datetime64[ns]')
+    monthly_sales.insert(0, 'Order_Date', month_starts)
+    return monthly_sales
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def category_agg(_load_filtered, data_version, region, category, start_date, end_date):
+    """Aggregate sales per category"""
+    filtered_df = _load_filtered()
+    # Only a handful of keys; sorting keeps the chart order stable across filters
+    return filtered_df.groupby('Category', sort=True, observed=True)['Sales'].sum().reset_index()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def top_products_agg(_load_filtered, data_version, region, category, start_date, end_date, n=10):
+    """Return the n best-selling products"""
+    filtered_df = _load_filtered()
+    product_sales = filtered_df.groupby('Product_Name', sort=False, observed=True).agg({
+        'Sales': 'sum',
+        'Profit': 'sum',
+        'Quantity': 'sum'
+    })
+    return top_n(product_sales, 'Sales', n).reset_index()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def regional_agg(_load_filtered, data_version, region, category, start_date, end_date):
+    """Aggregate sales, profit and order count per region"""
+    filtered_df = _load_filtered()
+    # Only a handful of keys; sorting keeps the bar order stable across filters
+    return filtered_df.groupby('Region', sort=True, observed=True).agg({
+        'Sales': 'sum',
+        'Profit': 'sum',
+        'Order_ID': 'nunique'
+    }).reset_index()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def top_customers_agg(_load_filtered, data_version, region, category, start_date, end_date, n=10):
+    """Return the n highest-spending customers with their order history"""
+    filtered_df = _load_filtered()
+    customer_stats = filtered_df.groupby('Customer_ID', sort=False, observed=True).agg(
+        Total_Spent=('Sales', 'sum'),
+        Total_Profit=('Profit', 'sum'),
+        Order_Count=('Order_ID', 'nunique'),
+        Last_Order=('Order_Date', 'max')
+    ).reset_index()
     
-    # Apply filters
-    filtered_df = df.copy()
-    if selected_region != 'All':
-        filtered_df = filtered_df[filtered_df['Region'] == selected_region]
-    if selected_category != 'All':
-        filtered_df = filtered_df[filtered_df['Category'] == selected_category]
+    # Plain arrays skip index alignment; both columns come from the same groupby
+    customer_stats['Avg_Order_Value'] = customer_stats['Total_Spent'].values / customer_stats['Order_Count'].values
+    return top_n(customer_stats, 'Total_Spent', n)
+
+AGGREGATIONS = (kpi_agg, monthly_agg, category_agg, top_products_agg, regional_agg, top_customers_agg)
+
+def compute_aggregates(df, region, category, start_date, end_date):
+    """Run every chart aggregation for the selected filters in parallel"""
+    filters = (region, category, start_date, end_date)
+    data_version = df.attrs['data_version']
     
-    filtered_df = filtered_df[
-        (filtered_df['Order_Date'] >= pd.to_datetime(start_date)) & 
-        (filtered_df['Order_Date'] <= pd.to_datetime(end_date))
-    ]
+    # Filtering is deferred until a view misses its cache, so a fully cached rerun is only lookups
+    load_filtered = shared_filter(df, *filters)
     
-    # Main Dashboard
+    # Workers share the script context so cached calls behave as in the main thread
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(AGGREGATIONS), initializer=add_script_run_ctx,
+                            initargs=(None, ctx)) as executor:
+        futures = [executor.submit(agg, load_filtered, data_version, *filters) for agg in AGGREGATIONS]
+        return tuple(future.result() for future in futures)
+
+def render_kpis(kpis):
+    """Key performance indicator cards"""
     st.markdown('<h2 class="section-header">📈 Key Performance Indicators</h2>', unsafe_allow_html=True)
     
     # KPI Metrics
     col1, col2, col3, col4 = st.columns(4)
     
+    total_sales = kpis['total_sales']
+    total_profit = kpis['total_profit']
+    
     with col1:
-        total_sales = filtered_df['Sales'].sum()
         st.metric("Total Sales", f"${total_sales:,.2f}")
     
     with col2:
-        total_profit = filtered_df['Profit'].sum()
         profit_margin = (total_profit / total_sales * 100) if total_sales > 0 else 0
         st.metric("Total Profit", f"${total_profit:,.2f}", f"{profit_margin:.1f}% Margin")
     
     with col3:
-        avg_order_value = filtered_df['Sales'].mean()
-        st.metric("Average Order Value", f"${avg_order_value:.2f}")
+        st.metric("Average Order Value", f"${kpis['avg_order_value']:.2f}")
     
     with col4:
-        total_orders = filtered_df['Order_ID'].nunique()
-        st.metric("Total Orders", f"{total_orders:,}")
-    
-    # Sales Trends
+        st.metric("Total Orders", f"{kpis['total_orders']:,}")
+
+def render_monthly(monthly_sales):
+    """Monthly sales trend chart"""
     st.markdown('<h2 class="section-header">📊 Sales Performance Over Time</h2>', unsafe_allow_html=True)
     
-    # Monthly sales trend
-    monthly_sales = filtered_df.groupby(filtered_df['Order_Date'].dt.to_period('M')).agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Order_ID': 'nunique'
-    }).reset_index()
-    monthly_sales['Order_Date'] = monthly_sales['Order_Date'].dt.to_timestamp()
-    
-    fig_sales = px.line(monthly_sales, x='Order_Date', y='Sales', 
-                       title='Monthly Sales Trend', markers=True)
+    fig_sales = go.Figure(go.Scatter(x=monthly_sales['Order_Date'].to_numpy(),
+                                     y=monthly_sales['Sales'].to_numpy(),
+                                     mode='lines+markers'))
+    fig_sales.update_layout(title='Monthly Sales Trend', xaxis_title='Order_Date', yaxis_title='Sales')
     st.plotly_chart(fig_sales, use_container_width=True)
-    
-    # Product Performance
+
+def render_products(category_sales, top_products):
+    """Category split and top products charts"""
     st.markdown('<h2 class="section-header">🏆 Product & Category Performance</h2>', unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Sales by Category
-        category_sales = filtered_df.groupby('Category')['Sales'].sum().reset_index()
-        fig_category = px.pie(category_sales, values='Sales', names='Category', 
-                             title='Sales Distribution by Category')
+        fig_category = go.Figure(go.Pie(values=category_sales['Sales'].to_numpy(),
+                                        labels=category_sales['Category'].to_numpy()))
+        fig_category.update_layout(title='Sales Distribution by Category')
         st.plotly_chart(fig_category, use_container_width=True)
     
     with col2:
         # Top Products
-        top_products = filtered_df.groupby('Product_Name').agg({
-            'Sales': 'sum',
-            'Profit': 'sum',
-            'Quantity': 'sum'
-        }).nlargest(10, 'Sales').reset_index()
-        
-        fig_products = px.bar(top_products, x='Sales', y='Product_Name', 
-                             orientation='h', title='Top 10 Products by Sales')
+        fig_products = go.Figure(go.Bar(x=top_products['Sales'].to_numpy(),
+                                        y=top_products['Product_Name'].to_numpy(),
+                                        orientation='h'))
+        fig_products.update_layout(title='Top 10 Products by Sales', xaxis_title='Sales', yaxis_title='Product_Name')
         st.plotly_chart(fig_products, use_container_width=True)
-    
-    # Regional Performance
+
+def render_regional(regional_sales):
+    """Sales and profit by region chart"""
     st.markdown('<h2 class="section-header">🌍 Regional Performance</h2>', unsafe_allow_html=True)
     
-    regional_sales = filtered_df.groupby('Region').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Order_ID': 'nunique'
-    }).reset_index()
-    
-    fig_region = px.bar(regional_sales, x='Region', y='Sales', 
-                       color='Profit', title='Sales & Profit by Region')
+    fig_region = go.Figure(go.Bar(x=regional_sales['Region'].to_numpy(),
+                                  y=regional_sales['Sales'].to_numpy(),
+                                  marker=dict(color=regional_sales['Profit'].to_numpy(),
+                                              colorscale='Plasma',
+                                              colorbar=dict(title='Profit'))))
+    fig_region.update_layout(title='Sales & Profit by Region', xaxis_title='Region', yaxis_title='Sales')
     st.plotly_chart(fig_region, use_container_width=True)
-    
-    # Customer Segmentation Preview
+
+def render_customers(top_customers):
+    """Top customers table"""
     st.markdown('<h2 class="section-header">👥 Customer Insights</h2>', unsafe_allow_html=True)
     
-    customer_stats = filtered_df.groupby('Customer_ID').agg({
-        'Sales': 'sum',
-        'Profit': 'sum',
-        'Order_ID': 'nunique',
-        'Order_Date': 'max'
-    }).reset_index()
+    st.dataframe(top_customers, use_container_width=True)
+
+def main():
+    st.markdown('<h1 class="main-header">🏪 Retail Sales Analytics Dashboard</h1>', unsafe_allow_html=True)
+    st.markdown("### Advanced Business Intelligence & Forecasting Platform")
+    
+    # Load data
+    df = load_data()
+    if df is None:
+        st.stop()
     
-    customer_stats.columns = ['Customer_ID', 'Total_Spent', 'Total_Profit', 'Order_Count', 'Last_Order']
-    customer_stats['Avg_Order_Value'] = customer_stats['Total_Spent'] / customer_stats['Order_Count']
+    # Sidebar
+    st.sidebar.title("🎛️ Dashboard Controls")
     
-    st.dataframe(customer_stats.nlargest(10, 'Total_Spent'), use_container_width=True)
+    # Date range filter
+    min_date = df['Order_Date'].min()
+    max_date = df['Order_Date'].max()
+    start_date = st.sidebar.date_input("Start Date", min_date)
+    end_date = st.sidebar.date_input("End Date", max_date)
+    
+    # Region filter
+    selected_region = st.sidebar.selectbox("Select Region", df.attrs['region_options'])
+    
+    # Category filter
+    selected_category = st.sidebar.selectbox("Select Category", df.attrs['category_options'])
+    
+    # Aggregate the filtered data; each view is cached on the filter values
+    kpis, monthly_sales, category_sales, top_products, regional_sales, top_customers = compute_aggregates(
+        df, selected_region, selected_category, start_date, end_date
+    )
+    
+    # Main Dashboard
+    render_kpis(kpis)
+    render_monthly(monthly_sales)
+    render_products(category_sales, top_products)
+    render_regional(regional_sales)
+    render_customers(top_customers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,8 @@
 # Retail Sales Analysis - Python Script
 # This can be run directly without Jupyter notebook issues
 
-import pandas as pd
+import os
+import polars as pl
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -9,25 +10,35 @@ import seaborn as sns
 print("🛍️ Retail Sales Analytics")
 print("=========================")
 
-# Load data
-df = pd.read_csv('data/superstore_sales.csv')
-df['Order_Date'] = pd.to_datetime(df['Order_Date'])
+# Load data (prepared by prepare_data.py)
+PARQUET_PATH = 'data/superstore_sales.parquet'
+if not os.path.exists(PARQUET_PATH):
+    raise SystemExit(f"{PARQUET_PATH} not found. Run 'python prepare_data.py' first.")
+lf = pl.scan_parquet(PARQUET_PATH)
 
-print(f"Dataset: {df.shape[0]} rows, {df.shape[1]} columns")
-print(f"Total Sales: ${df['Sales'].sum():,.2f}")
-print(f"Total Profit: ${df['Profit'].sum():,.2f}")
+# Run every aggregation in one parallel batch over the file
+summary, head, category_sales, region_sales, monthly_sales, profit = pl.collect_all([
+    lf.select(pl.len().alias('Rows'), pl.col('Sales').sum(), pl.col('Profit').sum()),
+    lf.head(5),
+    lf.group_by(pl.col('Category').cast(pl.String)).agg(pl.col('Sales').sum()).sort('Category'),
+    lf.group_by(pl.col('Region').cast(pl.String)).agg(pl.col('Sales').sum()).sort('Region'),
+    lf.group_by(pl.col('Order_Date').dt.truncate('1mo')).agg(pl.col('Sales').sum()).sort('Order_Date'),
+    lf.select('Profit')
+])
+
+print(f"Dataset: {summary['Rows'][0]} rows, {head.width} columns")
+print(f"Total Sales: ${summary['Sales'][0]:,.2f}")
+print(f"Total Profit: ${summary['Profit'][0]:,.2f}")
 
 # Display first rows
 print("\nFirst 5 rows:")
-print(df.head())
+print(head)
 
 # Basic analysis
 print("\n📊 Sales by Category:")
-category_sales = df.groupby('Category')['Sales'].sum()
 print(category_sales)
 
 print("\n🌍 Sales by Region:")
-region_sales = df.groupby('Region')['Sales'].sum()
 print(region_sales)
 
 # Create visualizations
@@ -35,28 +46,31 @@ plt.figure(figsize=(15, 10))
 
 # Plot 1: Sales by Category
 plt.subplot(2, 2, 1)
-category_sales.plot(kind='bar', color=['skyblue', 'lightcoral', 'lightgreen'])
+plt.bar(category_sales['Category'].to_list(), category_sales['Sales'].to_numpy(),
+        color=['skyblue', 'lightcoral', 'lightgreen'])
 plt.title('Sales by Category')
 plt.ylabel('Sales ($)')
 plt.xticks(rotation=45)
 
 # Plot 2: Monthly trend
 plt.subplot(2, 2, 2)
-monthly_sales = df.groupby(df['Order_Date'].dt.to_period('M'))['Sales'].sum()
-monthly_sales.plot(kind='line', marker='o', color='orange')
+plt.plot(monthly_sales['Order_Date'].to_numpy(), monthly_sales['Sales'].to_numpy(),
+         marker='o', color='orange')
 plt.title('Monthly Sales Trend')
 plt.ylabel('Sales ($)')
 plt.grid(True)
 
 # Plot 3: Regional sales
 plt.subplot(2, 2, 3)
-region_sales.plot(kind='bar', color=['red', 'blue', 'green', 'purple'])
+plt.bar(region_sales['Region'].to_list(), region_sales['Sales'].to_numpy(),
+        color=['red', 'blue', 'green', 'purple'])
 plt.title('Sales by Region')
 plt.ylabel('Sales ($)')
 
-# Plot 4: Profit distribution
+# Plot 4: Profit distribution, binned with numpy and drawn as bars
 plt.subplot(2, 2, 4)
-plt.hist(df['Profit'], bins=20, color='lightseagreen', alpha=0.7)
+counts, edges = np.histogram(profit['Profit'].to_numpy(), bins=20)
+plt.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='lightseagreen', alpha=0.7)
 plt.title('Profit Distribution')
 plt.xlabel('Profit ($)')
 plt.ylabel('Frequency')
@@ -64,4 +78,4 @@ plt.ylabel('Frequency')
 plt.tight_layout()
 plt.show()
 
-print("\n✅ Analysis complete! Run 'streamlit run app.py' for interactive dashboard.")
\ No newline at end of file
+print("\n✅ Analysis complete! Run 'streamlit run app.py' for interactive dashboard.")
@@ -0,0 +1,91 @@
+# Retail Sales Data Preparation
+# Builds the cleaned, typed dataset once and writes it to Parquet for the
+# dashboard and analysis script:
+#
+#     python prepare_data.py
+#
+# The dashboard rebuilds the file itself when it is missing, unreadable, older
+# than the CSV, or lacks a column added by build_dataset().
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CSV_PATH = 'data/superstore_sales.csv'
+PARQUET_PATH = 'data/superstore_sales.parquet'
+
+# Repeated text columns, stored as dictionary-encoded categoricals so that
+# filters and groupbys work on integer codes
+CATEGORICAL_DTYPES = {
+    'Customer_ID': 'category',
+    'Segment': 'category',
+    'Region': 'category',
+    'Category': 'category',
+    'Sub_Category': 'category'
+}
+
+# Columns added by build_dataset(); a Parquet file without them is outdated
+DERIVED_COLUMNS = ['Order_Year', 'Order_Quarter', 'Processing_Time', 'Order_MonthInt']
+
+def build_dataset(csv_path=CSV_PATH):
+    """Read the raw CSV and apply all feature engineering"""
+    df = pd.read_csv(
+        csv_path,
+        engine='pyarrow',
+        parse_dates=['Order_Date', 'Ship_Date'],
+        dtype=CATEGORICAL_DTYPES
+    )
+    
+    # Create additional features
+    df['Order_Year'] = df['Order_Date'].dt.year
+    df['Order_Quarter'] = df['Order_Date'].dt.quarter
+    order_days = df['Order_Date'].values.astype('datetime64[D]')
+    ship_days = df['Ship_Date'].values.astype('datetime64[D]')
+    # NaT views as INT64_MIN, so rows with a missing date are masked to <NA>
+    df['Processing_Time'] = pd.arrays.IntegerArray(
+        (ship_days.view('i8') - order_days.view('i8')).astype('int32'),
+        np.isnat(ship_days) | np.isnat(order_days)
+    )
+    # Months since the epoch, a compact integer key for the monthly groupby
+    df['Order_MonthInt'] = df['Order_Date'].values.astype('datetime64[M]').view('i8').astype('int32')
+    
+    # Keep rows in date order so date ranges can be sliced with a binary search
+    df = df.sort_values('Order_Date', kind='stable').reset_index(drop=True)
+    
+    return df
+
+def write_dataset(df, parquet_path=PARQUET_PATH):
+    """Write the prepared dataset to Parquet, replacing any old file atomically"""
+    # Write beside the target and swap it in, so readers never see a partial file
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', row_group_size=200_000)
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def parquet_is_current(parquet_path=PARQUET_PATH, csv_path=CSV_PATH):
+    """Check the Parquet file is readable, has every derived column and is newer than the CSV"""
+    if not os.path.exists(parquet_path):
+        return False
+    # Without the CSV (Parquet-only deployments) there is nothing to be stale against
+    if os.path.exists(csv_path) and os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        return False
+    try:
+        columns = pq.read_schema(parquet_path).names
+    except (OSError, pa.ArrowException):
+        # Truncated or corrupt file; rebuilding overwrites it
+        return False
+    return all(column in columns for column in DERIVED_COLUMNS)
+
+def main():
+    df = build_dataset()
+    write_dataset(df)
+    print(f"Wrote {df.shape[0]} rows, {df.shape[1]} columns to {PARQUET_PATH}")
+
+if __name__ == "__main__":
+    main()